@@ -0,0 +1,105 @@
+import hashlib
+import json
+import sqlite3
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Protocol
+
+
+def make_cache_key(
+    image_bytes: bytes,
+    system_prompt: str,
+    user_prompt: str,
+    model_id: str,
+    temperature: float,
+    top_p: float,
+    response_schema: str = "",
+) -> str:
+    """Build content-addressed cache key from everything that determines the response"""
+    hasher = hashlib.sha256()
+    parts = (image_bytes, system_prompt, user_prompt, model_id, response_schema)
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        hasher.update(struct.pack("<Q", len(part)))
+        hasher.update(part)
+    hasher.update(struct.pack("<dd", temperature, top_p))
+    return hasher.hexdigest()
+
+
+class CachedResponse(NamedTuple):
+    """Cached response text, token usage and Unix time it was stored"""
+    text: str
+    usage: Optional[Dict[str, Any]]
+    cached_at: float
+
+
+class ResponseStore(Protocol):
+    """Structural interface for response caches used by the pipeline"""
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return cached response for key, or None on miss"""
+        ...
+
+    def put(self, key: str, text: str, usage: Optional[Dict[str, Any]]) -> None:
+        """Store response text and usage"""
+        ...
+
+
+class ResponseCache:
+    """SQLite-backed cache of raw Gemini response text and token usage"""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, usage TEXT, cached_at REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+            if "cached_at" not in columns:
+                self._conn.execute("ALTER TABLE responses ADD COLUMN cached_at REAL NOT NULL DEFAULT 0")
+            self._conn.commit()
+        except sqlite3.Error:
+            self._conn.close()
+            raise
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return cached response for key, or None on miss"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT text, usage, cached_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        text, usage, cached_at = row
+        return CachedResponse(text, json.loads(usage) if usage else None, cached_at)
+
+    def put(self, key: str, text: str, usage: Optional[Dict[str, Any]]) -> None:
+        """Store response text and usage; cache write failures are non-fatal"""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, text, usage, cached_at) VALUES (?, ?, ?, ?)",
+                    (key, text, json.dumps(usage) if usage else None, time.time()),
+                )
+        except sqlite3.Error:
+            pass
+
+
+class NullResponseCache:
+    """Cache stand-in used when the cache database cannot be opened; always misses"""
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return None
+
+    def put(self, key: str, text: str, usage: Optional[Dict[str, Any]]) -> None:
+        pass
@@ -1,68 +1,45 @@
+from dataclasses import dataclass
+from functools import lru_cache
 from dotenv import load_dotenv
 import os
-from typing import Optional
 from app.exceptions import ConfigurationError
 
-_load_dotenv_called = False
 
-
-def _ensure_env_loaded():
-    global _load_dotenv_called
-    if not _load_dotenv_called:
-        load_dotenv()
-        _load_dotenv_called = True
-
-
-class Settings:
-    _api_key: Optional[str] = None
-    _model_id: Optional[str] = None
-    _temperature: Optional[float] = None
-    _top_p: Optional[float] = None
-
-    @classmethod
-    def _get_api_key(cls) -> str:
-        _ensure_env_loaded()
-        if cls._api_key is None:
-            cls._api_key = os.getenv("GEMINI_API_KEY")
-            if not cls._api_key:
-                raise ConfigurationError("GEMINI_API_KEY environment variable is not set")
-        return cls._api_key
-
-    @classmethod
-    def _get_model_id(cls) -> str:
-        _ensure_env_loaded()
-        if cls._model_id is None:
-            cls._model_id = os.getenv("GEMINI_MODEL")
-            if not cls._model_id:
-                raise ConfigurationError("GEMINI_MODEL environment variable is not set")
-        return cls._model_id
-
-    @classmethod
-    def _get_temperature(cls) -> float:
-        _ensure_env_loaded()
-        if cls._temperature is None:
-            cls._temperature = float(os.getenv("TEMPERATURE", "0.0"))
-        return cls._temperature
-
-    @classmethod
-    def _get_top_p(cls) -> float:
-        _ensure_env_loaded()
-        if cls._top_p is None:
-            cls._top_p = float(os.getenv("TOP_P", "0.1"))
-        return cls._top_p
-
-    @classmethod
-    def get_api_key(cls) -> str:
-        return cls._get_api_key()
-
-    @classmethod
-    def get_model_id(cls) -> str:
-        return cls._get_model_id()
-
-    @classmethod
-    def get_temperature(cls) -> float:
-        return cls._get_temperature()
-
-    @classmethod
-    def get_top_p(cls) -> float:
-        return cls._get_top_p()
+@dataclass(frozen=True, slots=True)
+class _Settings:
+    api_key: str
+    model_id: str
+    temperature: float
+    top_p: float
+    cache_path: str
+    cache_refresh_ttl: float
+
+
+@lru_cache(maxsize=1)
+def settings() -> _Settings:
+    """Load settings from environment once and return the immutable snapshot"""
+    load_dotenv()
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ConfigurationError("GEMINI_API_KEY environment variable is not set")
+
+    model_id = os.getenv("GEMINI_MODEL")
+    if not model_id:
+        raise ConfigurationError("GEMINI_MODEL environment variable is not set")
+
+    try:
+        temperature = float(os.getenv("TEMPERATURE", "0.0"))
+        top_p = float(os.getenv("TOP_P", "0.1"))
+        cache_refresh_ttl = float(os.getenv("OCR_CACHE_REFRESH_TTL", "0"))
+    except ValueError as e:
+        raise ConfigurationError(f"Invalid numeric setting: {str(e)}") from e
+
+    return _Settings(
+        api_key=api_key,
+        model_id=model_id,
+        temperature=temperature,
+        top_p=top_p,
+        cache_path=os.getenv("OCR_CACHE_PATH", ".cache/ocr_responses.db"),
+        cache_refresh_ttl=cache_refresh_ttl,
+    )
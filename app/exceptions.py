@@ -1,29 +1,29 @@
 class OCRException(Exception):
     """Base exception for OCR operations"""
-    pass
+    __slots__ = ()
 
 
 class ImageLoadError(OCRException):
     """Raised when image cannot be loaded"""
-    pass
+    __slots__ = ()
 
 
 class APIError(OCRException):
     """Raised when API call fails"""
-    pass
+    __slots__ = ()
 
 
 class ValidationError(OCRException):
     """Raised when input validation fails"""
-    pass
+    __slots__ = ()
 
 
 class ConfigurationError(OCRException):
     """Raised when configuration is invalid"""
-    pass
+    __slots__ = ()
 
 
 class JSONParseError(OCRException):
     """Raised when JSON parsing fails"""
-    pass
+    __slots__ = ()
 
@@ -1,6 +1,5 @@
-import json
+import orjson
 import sys
-from app.pipeline import run_pipeline
 from app.exceptions import OCRException
 
 
@@ -11,8 +10,11 @@ def main():
     print(f"Processing image: {image_path}")
     
     try:
+        # Imported here so prompt loading failures at import time get the same error handling
+        from app.pipeline import run_pipeline, wait_for_refreshes
         result = run_pipeline(image_path)
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode("utf-8"))
+        wait_for_refreshes()
     except OCRException as e:
         print(f"Error: {str(e)}", file=sys.stderr)
         sys.exit(1)
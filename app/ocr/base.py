@@ -1,12 +1,20 @@
-from abc import ABC, abstractmethod
-from PIL import Image
-from typing import Any
+from typing import TYPE_CHECKING, Any, Protocol
 
+if TYPE_CHECKING:
+    from google.genai import types
 
-class OCRClient(ABC):
-    """Base class for OCR client implementations"""
 
-    @abstractmethod
-    def extract(self, image: Image.Image, system_prompt: str, user_prompt: str) -> Any:
-        """Extract text/data from image using provided prompts"""
-        pass
+class AsyncOCRSession(Protocol):
+    """Structural interface for an async OCR session bound to one event loop"""
+
+    async def extract_async(self, image: "types.Part", system_prompt: str, user_prompt: str) -> Any:
+        """Async variant of extract for concurrent batches"""
+        ...
+
+
+class OCRClient(Protocol):
+    """Structural interface for OCR client implementations"""
+
+    def extract(self, image: "types.Part", system_prompt: str, user_prompt: str) -> Any:
+        """Extract text/data from pre-encoded image part using provided prompts"""
+        ...
@@ -1,34 +1,89 @@
+import asyncio
+import random
+import threading
+import time
+import httpx
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from google import genai
 from google.genai import types
-from PIL import Image
-from typing import Any, Optional
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from app.config.settings import Settings
-from app.ocr.base import OCRClient
+from typing import Any, AsyncIterator, Optional
+from app.config.settings import settings
+from app.ocr.schema import OCRResult
 from app.exceptions import APIError, ConfigurationError
 
 
-class GeminiOCRClient(OCRClient):
-    """Gemini API implementation of OCR client with retry logic"""
+_MAX_CONNECTIONS = 32
+_MAX_ATTEMPTS = 3
+_BACKOFF_MIN = 2.0
+_BACKOFF_MAX = 10.0
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for given 1-based attempt number"""
+    return min(_BACKOFF_MAX, max(_BACKOFF_MIN, 2.0 ** attempt)) + random.uniform(0, 1)
+
+
+def _http_options() -> types.HttpOptions:
+    """HTTP/2 keep-alive transport so concurrent calls multiplex over shared connections"""
+    client_args = {
+        "http2": True,
+        "limits": httpx.Limits(
+            max_keepalive_connections=_MAX_CONNECTIONS,
+            max_connections=_MAX_CONNECTIONS,
+        ),
+    }
+    return types.HttpOptions(client_args=client_args, async_client_args=dict(client_args))
+
+
+@lru_cache(maxsize=4)
+def _config_for(system_prompt: str) -> types.GenerateContentConfig:
+    """Build generation config once per system prompt (the SDK copies it per request)"""
+    s = settings()
+    return types.GenerateContentConfig(
+        temperature=s.temperature,
+        top_p=s.top_p,
+        response_mime_type="application/json",
+        response_schema=OCRResult,
+        system_instruction=system_prompt,
+    )
+
+
+def _create_client() -> genai.Client:
+    """Create Gemini SDK client with pooled HTTP/2 transport"""
+    try:
+        return genai.Client(api_key=settings().api_key, http_options=_http_options())
+    except ConfigurationError as e:
+        raise ConfigurationError(f"Failed to initialize Gemini client: {str(e)}") from e
+    except Exception as e:
+        raise APIError(f"Failed to create Gemini client: {str(e)}") from e
+
+
+class GeminiOCRClient:
+    """Gemini API implementation of OCR client with retry logic (process-wide singleton; use open_async_session for asyncio)"""
+
+    __slots__ = ("_client",)
 
     _instance: Optional['GeminiOCRClient'] = None
-    _client: Optional[Any] = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._client = None
+                    cls._instance = instance
         return cls._instance
 
     def __init__(self):
         if self._client is not None:
             return
-        
-        try:
-            self._client = genai.Client(api_key=Settings.get_api_key())
-        except ConfigurationError as e:
-            raise ConfigurationError(f"Failed to initialize Gemini client: {str(e)}") from e
-        except Exception as e:
-            raise APIError(f"Failed to create Gemini client: {str(e)}") from e
+
+        with self._lock:
+            if self._client is not None:
+                return
+            self._client = _create_client()
 
     @property
     def client(self):
@@ -36,41 +91,88 @@ class GeminiOCRClient(OCRClient):
             raise APIError("Client not initialized")
         return self._client
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type(APIError),
-        reraise=True
-    )
-    def extract(self, image: Image.Image, system_prompt: str, user_prompt: str) -> Any:
-        """Extract data from image using Gemini API with retry logic"""
+    @staticmethod
+    def _validate_response(response: Any) -> Any:
+        """Validate Gemini response is non-empty and not blocked"""
+        if not response:
+            raise APIError("Empty response from Gemini API")
+
         try:
-            config = types.GenerateContentConfig(
-                temperature=Settings.get_temperature(),
-                top_p=Settings.get_top_p(),
-                response_mime_type="application/json",
-                system_instruction=system_prompt,
-            )
+            block_reason = response.prompt_feedback.block_reason
+        except AttributeError:
+            block_reason = None
+        if block_reason:
+            raise APIError(f"Content blocked by safety filters: {block_reason}")
+
+        if not response.text:
+            raise APIError("Empty response text from Gemini API")
+
+        return response
+
+    def extract(self, image: types.Part, system_prompt: str, user_prompt: str) -> Any:
+        """Extract data from image using Gemini API with retry logic"""
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            try:
+                return self._extract_once(image, system_prompt, user_prompt)
+            except APIError:
+                if attempt == _MAX_ATTEMPTS:
+                    raise
+                time.sleep(_backoff_delay(attempt))
 
+    def _extract_once(self, image: types.Part, system_prompt: str, user_prompt: str) -> Any:
+        """Single Gemini API call without retries"""
+        try:
             response = self.client.models.generate_content(
-                model=Settings.get_model_id(),
+                model=settings().model_id,
                 contents=[image, user_prompt],
-                config=config
+                config=_config_for(system_prompt)
             )
+            return self._validate_response(response)
+        except APIError:
+            raise
+        except Exception as e:
+            raise APIError(f"Gemini API call failed: {str(e)}") from e
+
 
-            if not response:
-                raise APIError("Empty response from Gemini API")
+class GeminiAsyncSession:
+    """Async Gemini client scoped to one event loop, for concurrent batches via asyncio.gather"""
 
-            if hasattr(response, 'prompt_feedback') and response.prompt_feedback:
-                block_reason = getattr(response.prompt_feedback, 'block_reason', None)
-                if block_reason:
-                    raise APIError(f"Content blocked by safety filters: {block_reason}")
+    __slots__ = ("_aio",)
 
-            if not response.text:
-                raise APIError("Empty response text from Gemini API")
+    def __init__(self, aio: Any):
+        self._aio = aio
 
-            return response
+    async def extract_async(self, image: types.Part, system_prompt: str, user_prompt: str) -> Any:
+        """Async variant of extract with retry logic"""
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            try:
+                return await self._extract_once_async(image, system_prompt, user_prompt)
+            except APIError:
+                if attempt == _MAX_ATTEMPTS:
+                    raise
+                await asyncio.sleep(_backoff_delay(attempt))
+
+    async def _extract_once_async(self, image: types.Part, system_prompt: str, user_prompt: str) -> Any:
+        """Single async Gemini API call without retries"""
+        try:
+            response = await self._aio.models.generate_content(
+                model=settings().model_id,
+                contents=[image, user_prompt],
+                config=_config_for(system_prompt)
+            )
+            return GeminiOCRClient._validate_response(response)
         except APIError:
             raise
         except Exception as e:
             raise APIError(f"Gemini API call failed: {str(e)}") from e
+
+
+@asynccontextmanager
+async def open_async_session() -> AsyncIterator[GeminiAsyncSession]:
+    """Open an async session whose connection pool is bound to the running event loop"""
+    client = _create_client()
+    try:
+        yield GeminiAsyncSession(client.aio)
+    finally:
+        await client.aio.aclose()
+        client.close()
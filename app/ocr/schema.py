@@ -0,0 +1,54 @@
+from typing import List, Literal
+from pydantic import BaseModel
+
+
+class DocumentMetadata(BaseModel):
+    """Document classification and header fields"""
+    detected_type: Literal[
+        "OFFICIAL_INVOICE",
+        "STOCK_REGISTER",
+        "LEDGER_PAGE",
+        "INDEX_PAGE",
+        "ROUGH_ESTIMATE_OR_NOTE",
+    ]
+    entity_or_store_name: str
+    document_date: str
+    customer_or_account_name: str
+    folio_or_page_number: str
+
+
+class LineItem(BaseModel):
+    """Single extracted table row"""
+    row_id: int
+    date: str
+    description_raw: str
+    description_english: str
+    quantity_or_model: str
+    rate_or_unit_price: str
+    debit_or_receipt_amount: str
+    credit_or_issue_amount: str
+    balance: str
+    confidence_score: int
+
+
+class FinancialSummary(BaseModel):
+    """Document totals"""
+    sub_total: str
+    grand_total: str
+    advance_paid: str
+    balance_due: str
+
+
+class OverallAssessment(BaseModel):
+    """Model's overall confidence and quality notes"""
+    overall_confidence_score: str
+    quality_assessment: str
+
+
+class OCRResult(BaseModel):
+    """Structured OCR extraction result"""
+    document_metadata: DocumentMetadata
+    extracted_line_items: List[LineItem]
+    financial_summary: FinancialSummary
+    notes_and_calculations: List[str]
+    overall_assessment: OverallAssessment
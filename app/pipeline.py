@@ -1,45 +1,323 @@
-import json
-from typing import Dict, Any
-from app.ocr.gemini_client import GeminiOCRClient
-from app.processors.image_loader import load_image
+import asyncio
+import sqlite3
+import threading
+import time
+import orjson
+from pydantic import ValidationError as PydanticValidationError
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, AsyncContextManager, AsyncIterator, Final, Iterator, List, Mapping, Optional, Set
+from app.cache.response_cache import CachedResponse, NullResponseCache, ResponseCache, ResponseStore, make_cache_key
+from app.config.settings import settings
+from app.ocr.base import AsyncOCRSession, OCRClient
+from app.ocr.schema import OCRResult
 from app.utils.file_utils import read_file
-from app.exceptions import JSONParseError, OCRException
+from app.utils.validation import validate_image_path
+from app.exceptions import JSONParseError, OCRException, ValidationError
 
 
-_PROMPT_CACHE: Dict[str, str] = {}
+_PROMPTS_DIR: Final = Path(__file__).parent / "prompts"
+_RESPONSE_CACHE: Optional[ResponseStore] = None
+_KEY_LOCKS: Dict[str, "_KeyLockEntry"] = {}
+_KEY_LOCKS_GUARD = threading.Lock()
+_KEY_LOCK_POLL_INTERVAL = 0.05
+_REFRESH_THREADS: Set[threading.Thread] = set()
+_REFRESH_THREADS_GUARD = threading.Lock()
+_SCHEMA_FINGERPRINT: Final = orjson.dumps(OCRResult.model_json_schema(), option=orjson.OPT_SORT_KEYS).decode("utf-8")
 
 
-def _get_cached_prompt(path: str) -> str:
-    """Get prompt from cache or load from file"""
-    if path not in _PROMPT_CACHE:
-        _PROMPT_CACHE[path] = read_file(path)
-    return _PROMPT_CACHE[path]
+@lru_cache(maxsize=None)
+def load_prompt(path: str) -> str:
+    """Load prompt from file once per process"""
+    return read_file(path)
 
 
-def run_pipeline(image_path: str) -> Dict[str, Any]:
-    """Run OCR pipeline on image and return extracted data"""
+PROMPTS: Final[Mapping[str, str]] = MappingProxyType({
+    name: load_prompt(str(_PROMPTS_DIR / f"{name}.txt")) for name in ("system", "extraction")
+})
+SYSTEM_PROMPT: Final[str] = PROMPTS["system"]
+USER_PROMPT: Final[str] = PROMPTS["extraction"]
+
+
+def _get_response_cache() -> ResponseStore:
+    """Get response cache, opening the database on first use and disabling caching if that fails"""
+    global _RESPONSE_CACHE
+    if _RESPONSE_CACHE is None:
+        try:
+            _RESPONSE_CACHE = ResponseCache(settings().cache_path)
+        except (OSError, sqlite3.Error):
+            _RESPONSE_CACHE = NullResponseCache()
+    return _RESPONSE_CACHE
+
+
+def _response_cache_key(image_path: str, system_prompt: str, user_prompt: str) -> str:
+    """Compute response cache key for image file and prompts"""
+    with open(image_path, "rb") as f:
+        image_bytes = f.read()
+    s = settings()
+    return make_cache_key(
+        image_bytes, system_prompt, user_prompt, s.model_id, s.temperature, s.top_p, _SCHEMA_FINGERPRINT
+    )
+
+
+def _usage_from_response(response: Any) -> Optional[Dict[str, Any]]:
+    """Extract token usage from Gemini response"""
+    if not response.usage_metadata:
+        return None
+    return {
+        "input_tokens": response.usage_metadata.prompt_token_count,
+        "output_tokens": response.usage_metadata.candidates_token_count,
+    }
+
+
+def _attach_usage(data: Dict[str, Any], usage: Optional[Dict[str, Any]], cached: bool = False) -> Dict[str, Any]:
+    """Attach token usage to extracted data, flagging responses served from cache"""
+    if usage:
+        data["usage_metadata"] = {
+            "input_tokens": usage["input_tokens"],
+            "output_tokens": usage["output_tokens"],
+            "cached": cached,
+            "note": "Served from response cache; no tokens spent on this run" if cached else "Populated from Gemini API"
+        }
+    return data
+
+
+def _decode_text(text: str) -> Dict[str, Any]:
+    """Decode response JSON through OCRResult, falling back to raw JSON if it does not match the schema"""
+    try:
+        return OCRResult.model_validate_json(text).model_dump()
+    except PydanticValidationError:
+        pass
+
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError as e:
+        raise JSONParseError(f"Failed to parse JSON response: {str(e)}") from e
+
+
+def _parse_response(text: str, usage: Optional[Dict[str, Any]], cached: bool = False) -> Dict[str, Any]:
+    """Parse response JSON and attach token usage"""
+    return _attach_usage(_decode_text(text), usage, cached)
+
+
+def _data_from_response(response: Any, text: str, usage: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Use SDK-parsed schema object when available, otherwise decode text the same way cache hits do"""
+    parsed = response.parsed
+    if isinstance(parsed, OCRResult):
+        return _attach_usage(parsed.model_dump(), usage)
+    return _parse_response(text, usage)
+
+
+def _is_stale(cached: CachedResponse) -> bool:
+    """Check whether cached response is older than the refresh TTL"""
+    ttl = settings().cache_refresh_ttl
+    return ttl > 0 and time.time() - cached.cached_at > ttl
+
+
+class _KeyLockEntry:
+    """Per-key lock plus count of callers currently holding or waiting on it"""
+
+    __slots__ = ("lock", "refs")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.refs = 0
+
+
+def _checkout_key_lock(key: str) -> threading.Lock:
+    """Get per-key lock used to coalesce API calls for the same input, registering the caller"""
+    with _KEY_LOCKS_GUARD:
+        entry = _KEY_LOCKS.get(key)
+        if entry is None:
+            entry = _KEY_LOCKS[key] = _KeyLockEntry()
+        entry.refs += 1
+        return entry.lock
+
+
+def _return_key_lock(key: str) -> None:
+    """Unregister caller and drop the key's lock once nobody holds or waits on it"""
+    with _KEY_LOCKS_GUARD:
+        entry = _KEY_LOCKS[key]
+        entry.refs -= 1
+        if entry.refs == 0:
+            del _KEY_LOCKS[key]
+
+
+@contextmanager
+def _key_lock(key: str) -> Iterator[None]:
+    """Hold the key's lock for the duration of the block"""
+    lock = _checkout_key_lock(key)
+    try:
+        with lock:
+            yield
+    finally:
+        _return_key_lock(key)
+
+
+@asynccontextmanager
+async def _key_lock_async(key: str) -> AsyncIterator[None]:
+    """Hold the key's lock from the event loop by polling, so waiting never blocks the loop or a worker thread"""
+    lock = _checkout_key_lock(key)
     try:
-        image = load_image(image_path)
-        system_prompt = _get_cached_prompt("app/prompts/system.txt")
-        user_prompt = _get_cached_prompt("app/prompts/extraction.txt")
+        while not lock.acquire(blocking=False):
+            await asyncio.sleep(_KEY_LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            lock.release()
+    finally:
+        _return_key_lock(key)
+
+
+def _get_ocr_client() -> OCRClient:
+    """Import and create OCR client on first cache miss, keeping google-genai off the cache-hit path"""
+    from app.ocr.gemini_client import GeminiOCRClient
+    return GeminiOCRClient()
+
+
+def _open_async_session() -> AsyncContextManager[AsyncOCRSession]:
+    """Open a per-event-loop async OCR session (SDK imported only on first miss)"""
+    from app.ocr.gemini_client import open_async_session
+    return open_async_session()
+
+
+def _load_image_for_ocr(image_path: str) -> Any:
+    """Import image loader on first cache miss and load image for upload"""
+    from app.processors.image_loader import load_image_for_ocr
+    return load_image_for_ocr(image_path)
+
 
-        ocr_client = GeminiOCRClient()
-        response = ocr_client.extract(image, system_prompt, user_prompt)
+def _cached_result(cache: ResponseStore, key: str, image_path: str, refresh: bool) -> Optional[Dict[str, Any]]:
+    """Return parsed cache hit for key (scheduling a refresh if stale and allowed), or None on miss"""
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    if refresh and _is_stale(cached):
+        _schedule_refresh(cache, key, image_path)
+    return _parse_response(cached.text, cached.usage, cached=True)
 
+
+def _store_response(cache: ResponseStore, key: str, response: Any) -> Dict[str, Any]:
+    """Store API response in cache and return extracted data"""
+    text = response.text
+    usage = _usage_from_response(response)
+    data = _data_from_response(response, text, usage)
+    cache.put(key, text, usage)
+    return data
+
+
+def _fetch_and_store(cache: ResponseStore, key: str, image_path: str) -> Dict[str, Any]:
+    """Call OCR API for image and store the response in cache"""
+    image = _load_image_for_ocr(image_path)
+    response = _get_ocr_client().extract(image, SYSTEM_PROMPT, USER_PROMPT)
+    return _store_response(cache, key, response)
+
+
+def _refresh(cache: ResponseStore, key: str, image_path: str) -> None:
+    """Re-extract stale cache entry, skipping if a call for the key is already in flight"""
+    lock = _checkout_key_lock(key)
+    try:
+        if not lock.acquire(blocking=False):
+            return
         try:
-            data = json.loads(response.text)
-        except json.JSONDecodeError as e:
-            raise JSONParseError(f"Failed to parse JSON response: {str(e)}") from e
-
-        if response.usage_metadata:
-            data["usage_metadata"] = {
-                "input_tokens": response.usage_metadata.prompt_token_count,
-                "output_tokens": response.usage_metadata.candidates_token_count,
-                "note": "Populated from Gemini API"
-            }
-
-        return data
+            _fetch_and_store(cache, key, image_path)
+        except Exception:
+            # Best effort: the stale entry keeps being served and a later hit retries
+            pass
+        finally:
+            lock.release()
+    finally:
+        _return_key_lock(key)
+        with _REFRESH_THREADS_GUARD:
+            _REFRESH_THREADS.discard(threading.current_thread())
+
+
+def _schedule_refresh(cache: ResponseStore, key: str, image_path: str) -> None:
+    """Refresh stale cache entry in a background thread"""
+    thread = threading.Thread(target=_refresh, args=(cache, key, image_path), daemon=True)
+    with _REFRESH_THREADS_GUARD:
+        _REFRESH_THREADS.add(thread)
+    thread.start()
+
+
+def wait_for_refreshes(timeout: Optional[float] = None) -> None:
+    """Wait for pending background cache refreshes; short-lived callers must call this before exiting"""
+    with _REFRESH_THREADS_GUARD:
+        pending = list(_REFRESH_THREADS)
+    for thread in pending:
+        thread.join(timeout)
+
+
+def run_pipeline(image_path: str) -> Dict[str, Any]:
+    """Run OCR pipeline on image and return extracted data"""
+    try:
+        validate_image_path(image_path)
+        cache = _get_response_cache()
+        key = _response_cache_key(image_path, SYSTEM_PROMPT, USER_PROMPT)
+        data = _cached_result(cache, key, image_path, refresh=True)
+        if data is not None:
+            return data
+
+        with _key_lock(key):
+            data = _cached_result(cache, key, image_path, refresh=False)
+            if data is not None:
+                return data
+            return _fetch_and_store(cache, key, image_path)
     except OCRException:
         raise
     except Exception as e:
         raise OCRException(f"Pipeline execution failed: {str(e)}") from e
+
+
+async def run_pipeline_batch(image_paths: List[str], concurrency: int = 8) -> List[Dict[str, Any]]:
+    """Run OCR pipeline concurrently on multiple images, preserving input order"""
+    if concurrency < 1:
+        raise ValidationError("Concurrency must be at least 1")
+
+    cache = _get_response_cache()
+    semaphore = asyncio.Semaphore(concurrency)
+    session_lock = asyncio.Lock()
+    session: Optional[AsyncOCRSession] = None
+    exit_stack = AsyncExitStack()
+
+    async def _session() -> AsyncOCRSession:
+        """Open the batch's async OCR session on first cache miss"""
+        nonlocal session
+        async with session_lock:
+            if session is None:
+                session = await exit_stack.enter_async_context(_open_async_session())
+        return session
+
+    async def _one(image_path: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                await asyncio.to_thread(validate_image_path, image_path)
+                key = await asyncio.to_thread(_response_cache_key, image_path, SYSTEM_PROMPT, USER_PROMPT)
+                data = _cached_result(cache, key, image_path, refresh=True)
+                if data is not None:
+                    return data
+
+                async with _key_lock_async(key):
+                    data = _cached_result(cache, key, image_path, refresh=False)
+                    if data is not None:
+                        return data
+
+                    image = await asyncio.to_thread(_load_image_for_ocr, image_path)
+                    response = await (await _session()).extract_async(image, SYSTEM_PROMPT, USER_PROMPT)
+                    return _store_response(cache, key, response)
+            except OCRException:
+                raise
+            except Exception as e:
+                raise OCRException(f"Pipeline execution failed for {image_path}: {str(e)}") from e
+
+    async with exit_stack:
+        tasks = [asyncio.ensure_future(_one(path)) for path in image_paths]
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            # Stop and drain sibling tasks before the session closes underneath them
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
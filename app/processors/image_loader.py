@@ -1,16 +1,43 @@
-from PIL import Image
-from typing import Optional
+import io
+from google.genai import types
+from PIL import Image, ImageOps
+from typing import Optional, Tuple
 from app.exceptions import ImageLoadError
 from app.utils.validation import validate_image_path, validate_image_format
 
+OCR_MAX_SIDE = 2048
+OCR_JPEG_QUALITY = 85
 
-def load_image(path: str) -> Image.Image:
-    """Load and validate image from file path"""
+
+def load_image(path: str, draft_size: Optional[Tuple[int, int]] = None) -> Image.Image:
+    """Load and validate image from file path, optionally decoding JPEGs at reduced scale"""
     try:
         validated_path = validate_image_path(path)
         image = Image.open(validated_path)
+        if draft_size is not None:
+            image.draft("RGB", draft_size)
         image.load()
         validate_image_format(image)
         return image
     except (OSError, IOError, Image.UnidentifiedImageError) as e:
         raise ImageLoadError(f"Failed to load image from {path}: {str(e)}") from e
+
+
+def optimize_image(image: Image.Image, max_side: int = OCR_MAX_SIDE, quality: int = OCR_JPEG_QUALITY) -> types.Part:
+    """Downscale image to fit max_side and encode once as an RGB JPEG content part"""
+    try:
+        optimized = ImageOps.exif_transpose(image)
+        optimized.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        if optimized.mode != "RGB":
+            optimized = optimized.convert("RGB")
+
+        buffer = io.BytesIO()
+        optimized.save(buffer, "JPEG", quality=quality, optimize=True)
+        return types.Part.from_bytes(data=buffer.getvalue(), mime_type="image/jpeg")
+    except (OSError, ValueError) as e:
+        raise ImageLoadError(f"Failed to optimize image: {str(e)}") from e
+
+
+def load_image_for_ocr(path: str) -> types.Part:
+    """Load, validate and optimize image for upload to OCR API"""
+    return optimize_image(load_image(path, draft_size=(OCR_MAX_SIDE, OCR_MAX_SIDE)))
@@ -1,29 +1,34 @@
 import os
-from pathlib import Path
-from PIL import Image
-from typing import Tuple
+import stat
+from typing import TYPE_CHECKING, Tuple
 from app.exceptions import ValidationError, ImageLoadError
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 
 def validate_image_path(image_path: str) -> str:
-    """Validate image path exists and is readable"""
+    """Validate image path exists and is a readable regular file"""
     if not image_path:
         raise ValidationError("Image path cannot be empty")
     
-    path = Path(image_path)
-    if not path.exists():
-        raise ValidationError(f"Image path does not exist: {image_path}")
+    try:
+        st = os.stat(image_path)
+    except (FileNotFoundError, NotADirectoryError) as e:
+        raise ValidationError(f"Image path does not exist: {image_path}") from e
+    except OSError as e:
+        raise ValidationError(f"Image path is not accessible: {image_path}: {str(e)}") from e
     
-    if not path.is_file():
+    if not stat.S_ISREG(st.st_mode):
         raise ValidationError(f"Image path is not a file: {image_path}")
     
-    if not os.access(path, os.R_OK):
-        raise ValidationError(f"Image file is not readable: {image_path}")
+    if not os.access(image_path, os.R_OK):
+        raise ValidationError(f"Image path is not readable: {image_path}")
     
-    return str(path)
+    return image_path
 
 
-def validate_image_format(image: Image.Image) -> None:
+def validate_image_format(image: "Image.Image") -> None:
     """Validate image format and basic properties"""
     if image.format is None:
         raise ImageLoadError("Image format could not be determined")
@@ -32,7 +37,7 @@ def validate_image_format(image: Image.Image) -> None:
         raise ImageLoadError("Image has invalid dimensions")
 
 
-def get_image_info(image: Image.Image) -> Tuple[int, int, str]:
+def get_image_info(image: "Image.Image") -> Tuple[int, int, str]:
     """Get image dimensions and format"""
     return image.size[0], image.size[1], image.format or "Unknown"
 